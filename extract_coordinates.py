@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # vim: set fileencoding=utf-8 :
 
 # Copyright (c) 2015 Code for Karlsruhe (http://codefor.de/karlsruhe)
@@ -27,16 +27,14 @@ Script to extract street coordinates from OSM data.
 Takes ``highways.osm`` and outputs data into ``streets.geojson``.
 """
 
-from __future__ import unicode_literals
-
-import codecs
+import array
 import collections
-import json
 import os.path
 
-import geojson
 from lxml import etree
 
+from jsonutil import to_json
+
 
 # Streets are straightforward: They are stored as "way" objects in OSM
 # and have a "highway" and a "name" tag. The only non-trivial thing is
@@ -78,15 +76,11 @@ from lxml import etree
 # marked by nodes only are currently not exported, because they end up
 # as very prominent markers on the map (this only affects Paulckeplatz).
 
+# Values of the "leisure" tag for which ways are exported as areas
+LEISURE_AREAS = frozenset(['park', 'pitch', 'common'])
 
-def check(d, k, v):
-    """
-    Check if d[k] == v.
-    """
-    try:
-        return d[k] == v
-    except KeyError:
-        return False
+# Member roles of multipolygon relations that we resolve
+MULTIPOLYGON_ROLES = frozenset(['inner', 'outer'])
 
 
 def parse_osm(f):
@@ -95,63 +89,96 @@ def parse_osm(f):
     """
     relations = {}
     ways = {}
-    nodes = {}
+    # Node coordinates are stored in flat arrays instead of a tuple per
+    # node, which makes a huge difference in memory usage. For the same
+    # reason OSM IDs are stored as integers instead of strings.
+    node_index = {}
+    lons = array.array('d')
+    lats = array.array('d')
     node_refs = []
     tags = {}
     members = []
-    for event, element in etree.iterparse(f):
-        if element.tag == 'node':
-            nodes[element.get('id')] = (float(element.get('lon')),
-                                        float(element.get('lat')))
-            tags = {}
-        elif element.tag == 'tag':
-            tags[element.get('k')] = element.get('v')
-        elif element.tag == 'nd':
-            node_refs.append(element.get('ref'))
-        elif element.tag == 'way':
-            d = {'nodes': node_refs}
+
+    # The handlers access the attributes via ``element.attrib``, which
+    # is faster than separate calls to ``element.get``.
+
+    def on_node(element):
+        attrib = element.attrib
+        node_index[int(attrib['id'])] = len(lons)
+        lons.append(float(attrib['lon']))
+        lats.append(float(attrib['lat']))
+        tags.clear()
+
+    def on_tag(element):
+        attrib = element.attrib
+        tags[attrib['k']] = attrib['v']
+
+    def on_nd(element):
+        node_refs.append(int(element.attrib['ref']))
+
+    def on_way(element):
+        d = {'nodes': list(node_refs)}
+        d.update(tags)
+        ways[int(element.attrib['id'])] = d
+        tags.clear()
+        del node_refs[:]
+
+    def on_relation(element):
+        name = tags.get('name')
+        if name and (tags.get('leisure') == 'park' or
+                (tags.get('highway') == 'pedestrian' and
+                tags.get('type') == 'multipolygon')):
+            d = {'members': list(members)}
             d.update(tags)
-            ways[element.get('id')] = d
-            tags = {}
-            node_refs = []
-        elif element.tag == 'relation':
-            name = tags.get('name')
-            if name and (check(tags, 'leisure', 'park') or
-                    (check(tags, 'highway', 'pedestrian') and
-                    check(tags, 'type', 'multipolygon'))):
-                d = {'members': members}
-                d.update(tags)
-                if name in relations:
-                    raise ValueError('Duplicate relation "%s".' % name)
-                relations[name] = d
-            tags = {}
-            members = []
-        elif element.tag == 'member':
-            members.append(dict(element.attrib))
+            if name in relations:
+                raise ValueError('Duplicate relation "%s".' % name)
+            relations[name] = d
+        tags.clear()
+        del members[:]
+
+    def on_member(element):
+        attrib = element.attrib
+        members.append((int(attrib['ref']), attrib.get('role', 'outer')))
+
+    handlers = {
+        'node': on_node,
+        'tag': on_tag,
+        'nd': on_nd,
+        'way': on_way,
+        'relation': on_relation,
+        'member': on_member,
+    }
+    for event, element in etree.iterparse(f, events=('end',),
+                                          tag=tuple(handlers)):
+        handlers[element.tag](element)
         element.clear()
+        # Drop references to already processed siblings so that the
+        # tree doesn't grow while parsing.
+        while element.getprevious() is not None:
+            del element.getparent()[0]
 
     # Resolve node references in ways
-    for id, props in ways.iteritems():
+    for id, props in ways.items():
         try:
-            props['coordinates'] = [nodes[ref] for ref in props['nodes']]
+            indices = [node_index[ref] for ref in props['nodes']]
         except KeyError:
-            pass
+            continue
+        props['coordinates'] = [(lons[i], lats[i]) for i in indices]
 
     # Resolve inner/outer members of multipolygon relations
-    for id, props in relations.iteritems():
-        if check(props, 'type', 'multipolygon'):
+    for id, props in relations.items():
+        if props.get('type') == 'multipolygon':
             props['inner'] = []
             props['outer'] = []
-            for member in props['members']:
-                role = member.get('role', 'outer')
-                if role in ['inner', 'outer']:
-                    props[role].append(ways[member['ref']])
+            for ref, role in props['members']:
+                if role in MULTIPOLYGON_ROLES:
+                    props[role].append(ways[ref])
 
     # Extract streets
     streets = collections.defaultdict(lambda: [])
-    for way in ways.itervalues():
+    for way in ways.values():
         if ('name' in way) and ('coordinates' in way):
-            if ('highway' in way) or way.get('leisure') in ['park', 'pitch', 'common']:
+            if ('highway' in way) or way.get('leisure') in LEISURE_AREAS:
                 streets[way['name']].append(way)
 
     return streets, relations
@@ -165,50 +192,71 @@ def ways2geometry(ways):
         way = ways[0]
         highway = way.get('highway')
         if ((way.get('area', '') == 'yes' and highway == 'pedestrian') or
-                (way.get('leisure') in ['park', 'pitch', 'common'])):
+                (way.get('leisure') in LEISURE_AREAS)):
             # See http://wiki.openstreetmap.org/wiki/Key:area
-            return geojson.Polygon([way['coordinates']])
+            return {'type': 'Polygon', 'coordinates': [way['coordinates']]}
         elif highway:
-            return geojson.LineString(way['coordinates'])
+            return {'type': 'LineString', 'coordinates': way['coordinates']}
     else:
-        return geojson.MultiLineString([w['coordinates'] for w in ways])
+        return {'type': 'MultiLineString',
+                'coordinates': [w['coordinates'] for w in ways]}
 
 
 def relation2geometry(relation):
     """
     Convert relation data into a GeoJSON object.
     """
-    if check(relation, 'type', 'multipolygon'):
+    if relation.get('type') == 'multipolygon':
         outer = relation['outer']
         inner = relation['inner']
         if not inner:
-            return geojson.MultiPolygon([(o['coordinates'],) for o in outer])
+            return {'type': 'MultiPolygon',
+                    'coordinates': [[o['coordinates']] for o in outer]}
         if len(outer) == 1:
             polygons = [outer[0]['coordinates']]
             for way in inner:
                 polygons.append(way['coordinates'])
-            return geojson.MultiPolygon([polygons])
+            return {'type': 'MultiPolygon', 'coordinates': [polygons]}
         raise ValueError('Unknown inner/outer configuration %r' % relation)
     else:
         raise ValueError('Unknown relation type %r' % relation)
 
 
+def iter_features(streets, relations):
+    """
+    Generate GeoJSON features for streets and relations.
+    """
+    for name, ways in streets.items():
+        yield {'type': 'Feature', 'id': name, 'properties': {},
+               'geometry': ways2geometry(ways)}
+    for name, props in relations.items():
+        yield {'type': 'Feature', 'id': name, 'properties': {},
+               'geometry': relation2geometry(props)}
+
+
+def write_feature_collection(f, features):
+    """
+    Write GeoJSON features as a feature collection to a binary file.
+
+    The features are serialized one by one, so the whole collection
+    never has to be held in memory as a single object or string.
+    """
+    f.write(b'{"type":"FeatureCollection","features":[')
+    for i, feature in enumerate(features):
+        if i:
+            f.write(b',')
+        f.write(b'\n')
+        f.write(to_json(feature, compact=True))
+    f.write(b'\n]}\n')
+
+
 if __name__ == '__main__':
     HERE = os.path.dirname(os.path.abspath(__file__))
     OSM = os.path.join(HERE, 'karlsruhe.osm')
     GEOJSON = os.path.join(HERE, 'coordinates.geojson')
 
-    with open(OSM, 'r') as f:
+    with open(OSM, 'rb') as f:
         streets, relations = parse_osm(f)
 
-    features = []
-    for name, ways in streets.iteritems():
-        features.append(geojson.Feature(geometry=ways2geometry(ways),
-                        id=name))
-    for name, props in relations.iteritems():
-        features.append(geojson.Feature(geometry=relation2geometry(props),
-                        id=name))
-    collection = geojson.FeatureCollection(features)
-
-    with codecs.open(GEOJSON, 'w', encoding='utf8') as f:
-        geojson.dump(collection, f)
+    with open(GEOJSON, 'wb') as f:
+        write_feature_collection(f, iter_features(streets, relations))
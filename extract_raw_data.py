@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # vim: set fileencoding=utf-8 :
 
 # Copyright (c) 2015 Code for Karlsruhe (http://codefor.de/karlsruhe)
@@ -27,85 +27,130 @@ Script to extract raw data from Karlsruhe street names PDF.
 Takes ``strassennamen.pdf`` and outputs data into ``raw_data.json``.
 """
 
-from __future__ import unicode_literals
-
-import codecs
-import cStringIO
+import concurrent.futures
+import hashlib
 import json
 import os.path
 import re
 
+import pdfminer
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
 from pdfminer.pdfpage import PDFPage
 from pdfminer.converter import TextConverter
-from pdfminer.layout import LAParams
+
+from jsonutil import to_json
 
 
 FLAGS = re.UNICODE | re.IGNORECASE
 
+HEADER_REGEX = re.compile(r'([^\d,]+)\D*(\d\d\d\d)?', FLAGS)
+DASH_REGEX = re.compile(r'\s*-\s*', FLAGS)
+PREVIOUS_REGEX = re.compile(
+    r'(?:bzw\.\s*)?(?:ca\.\s*)?(?:um\s*)?(\d\d\d\d?)\s+(.*)', FLAGS)
+
+# Maps all separators between previous street names to commas
+PREVIOUS_SPLIT_TABLE = str.maketrans(';./', ',,,')
+
+# Trailing all-lowercase words behind a street name. This one must be
+# case-sensitive, hence no FLAGS.
+SUFFIX_REGEX = re.compile(r'(?:\s+[a-zäöüß]+)+$', re.UNICODE)
+
 
 def collapse_ws(s):
     """
     Collapse whitespace in a string.
     """
-    return re.sub(r'\s+', ' ', s.strip(), FLAGS)
+    return ' '.join(s.split())
 
 
 # Strings that are part of the general header
-HEADER_STRINGS = ['Liegenschaftsamt', 'Straßennamen in Karlsruhe']
+HEADER_STRINGS = frozenset(['Liegenschaftsamt', 'Straßennamen in Karlsruhe'])
+
+class NullWriter(object):
+    """
+    File-like object that discards everything written to it.
+    """
+    def write(self, data):
+        pass
+
+    def close(self):
+        pass
+
 
 class Converter(TextConverter):
 
     def __init__(self, *args, **kwargs):
         super(Converter, self).__init__(*args, **kwargs)
-        self.entries = []
-        self._entry = None
-
-    def _store_entry(self):
-        if self._entry:
-            self._entry = {k: collapse_ws(v) for k, v in self._entry.items()}
-            h = self._entry['header']
-            if len(h) > 1 and h not in HEADER_STRINGS:
-                self.entries.append(self._entry)
-        self._entry = {'header': '', 'previous': '', 'info': ''}
-
-    def render_string(self, textstate, seq):
+        # List of (field, text) tuples, see ``assemble_entries``
+        self.fragments = []
+        # Maps fonts to whether they are bold. pdfminer reuses the font
+        # objects, so this only needs to be figured out once per font.
+        self._bold = {}
+
+    def render_string(self, textstate, seq, *args):
         # We use the font style to distinguish entry headers, previous
         # street names and general information. Note that the italic
         # text in this PDF is not due to an italic font but is achieved
         # using a matrix transform.
         font = textstate.font
+        decode = font.decode
+        to_unichr = font.to_unichr
         chars = []
         for s in seq:
-            if isinstance(s, str):
-                chars.extend(font.to_unichr(char) for char in font.decode(s))
+            if isinstance(s, bytes):
+                chars.extend(map(to_unichr, decode(s)))
         text = ''.join(chars)
         if textstate.matrix[2] == 0:
-            if textstate.font.basefont.endswith('Bd'):
+            try:
+                bold = self._bold[font]
+            except KeyError:
+                bold = self._bold[font] = font.basefont.endswith('Bd')
+            if bold:
                 # Bold font
-                self._store_entry()
-                self._entry['header'] += text
+                self.fragments.append(('header', text))
             else:
                 # Light font
-                self._entry['info'] += text
+                self.fragments.append(('info', text))
         else:
             # Italic font
-            self._entry['previous'] += text
-        return super(Converter, self).render_string(textstate, seq)
+            self.fragments.append(('previous', text))
+        # The base class would lay out the individual characters, which is
+        # expensive and not needed: We only use the fragments collected
+        # above and discard the page layout.
 
-    def close(self):
-        self._store_entry()
-        return super(Converter, self).close()
+    def receive_layout(self, ltpage):
+        pass
 
 
-def extract_entries(pdf_filename):
+def assemble_entries(fragments):
     """
-    Extract entries from PDF file.
+    Assemble text fragments into entries.
+
+    Each header fragment starts a new entry, the following fragments
+    are added to that entry.
+    """
+    entries = []
+    entry = None
+    for field, text in fragments:
+        if field == 'header':
+            entry = {'header': [], 'previous': [], 'info': []}
+            entries.append(entry)
+        if entry is not None:
+            entry[field].append(text)
+    entries = [{k: collapse_ws(''.join(v)) for k, v in entry.items()}
+               for entry in entries]
+    return [entry for entry in entries if len(entry['header']) > 1 and
+            entry['header'] not in HEADER_STRINGS]
+
+
+def extract_fragments(pdf_filename, page_numbers=None):
+    """
+    Extract text fragments from some pages of a PDF file.
     """
-    output = cStringIO.StringIO()
     rsrcmgr = PDFResourceManager(caching=True)
-    device = Converter(rsrcmgr, output, codec='utf8', laparams=LAParams())
-    page_numbers = set()
+    # No layout analysis is necessary, since the text is collected directly
+    # from the content stream.
+    device = Converter(rsrcmgr, NullWriter(), codec='utf8', laparams=None)
     try:
         with open(pdf_filename, 'rb') as f:
             interpreter = PDFPageInterpreter(rsrcmgr, device)
@@ -115,30 +160,78 @@ def extract_entries(pdf_filename):
                 interpreter.process_page(page)
     finally:
         device.close()
-    return device.entries
+    return device.fragments
+
+
+def extract_entries(pdf_filename, processes=None):
+    """
+    Extract entries from PDF file.
+
+    pdfminer is pure Python and hence slow, so the pages are split into
+    consecutive chunks which are processed in parallel. Entries can span
+    page breaks, so the workers only return the text fragments, which
+    are then assembled into entries in their original order.
+    """
+    with open(pdf_filename, 'rb') as f:
+        num_pages = sum(1 for _ in PDFPage.get_pages(f))
+    processes = min(processes or os.cpu_count() or 1, num_pages)
+    if processes < 2:
+        return assemble_entries(extract_fragments(pdf_filename))
+    chunk_size = -(-num_pages // processes)
+    chunks = [set(range(i, min(i + chunk_size, num_pages)))
+              for i in range(0, num_pages, chunk_size)]
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        results = executor.map(extract_fragments,
+                               [pdf_filename] * len(chunks), chunks)
+        return assemble_entries([fragment for fragments in results
+                                 for fragment in fragments])
+
+
+def load_entries(pdf_filename, cache_dir):
+    """
+    Extract entries from PDF file, using a cache if possible.
+
+    The entries are stored in ``cache_dir`` under a SHA-256 hash of the
+    PDF file, the source code of this script and the pdfminer version.
+    Hence the slow PDF parsing is only repeated if one of these changes.
+    """
+    sha256 = hashlib.sha256()
+    sha256.update(pdfminer.__version__.encode('utf8'))
+    for filename in [__file__, pdf_filename]:
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+    cache_filename = os.path.join(cache_dir, sha256.hexdigest() + '.json')
+    try:
+        with open(cache_filename, 'rb') as f:
+            return json.loads(f.read())
+    except (IOError, ValueError):
+        pass
+    entries = extract_entries(pdf_filename)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_filename = cache_filename + '.tmp'
+    with open(temp_filename, 'wb') as f:
+        f.write(to_json(entries))
+    os.replace(temp_filename, cache_filename)
+    return entries
 
 
 def parse_header(s):
     """
     Parse an entry header into the street name and year.
     """
-    m = re.match(r'([^\d,]+)\D*(\d\d\d\d)?', s, FLAGS)
+    m = HEADER_REGEX.match(s)
     if not m:
         return (None, None)
     g = m.groups()
     street = g[0].strip()
-    street = re.sub(r'\s*-\s*', '-', street, FLAGS)
+    street = DASH_REGEX.sub('-', street)
     year = int(g[1]) if g[1] else None
 
     # Sometimes there is additional stuff behind the street name,
     # e.g. "Unterer Lichtenbergweg in den 1970". That stuff always
     # is all lowercase.
-    parts = list(reversed(street.split()))
-    if len(parts) > 1:
-        for i in range(len(parts)):
-            if not parts[i].islower():
-                break
-        street = ' '.join(reversed(parts[i:]))
+    street = SUFFIX_REGEX.sub('', street)
 
     street = street.replace('Strasse', 'Straße')
     return (street, year)
@@ -151,11 +244,10 @@ def parse_previous(s):
     if not s.strip():
         return []
     entries = []
-    parts = re.split(r'[,;./]', s, FLAGS)
+    parts = s.translate(PREVIOUS_SPLIT_TABLE).split(',')
     for part in parts:
         part = part.strip()
-        m = re.match(r'(?:bzw\.\s*)?(?:ca\.\s*)?(?:um\s*)?(\d\d\d\d?)\s+(.*)',
-                     part, FLAGS)
+        m = PREVIOUS_REGEX.match(part)
         if m:
             g = m.groups()
             entries.append((int(g[0]), g[1].strip()))
@@ -179,96 +271,144 @@ def parse_entries(entries):
     return streets
 
 
+# Manual fixes for the previous names of streets
+MANUAL_PREVIOUS = {
+    'Albring': [(None, 'Albtalstraße'), (1935, 'Kolpingstraße')],
+    'Am Alten Bahnhof': [(1920, 'Bahnhofplatz/Eisenbahnstraße')],
+    'Am Illwig': [(1957, 'Geranienstraße')],
+    'Badenwerkstraße': [(None, 'Am Festplatz'), (1964, 'Lammstraße')],
+    'Blumentorstraße': [(None, 'Blumenvorstadt'), (1905, 'Blumenstraße')],
+    'Eichelgasse': [(1447, 'Müllers-/Eichelgäßle'), (None, 'Mühlgasse'), (1930, 'Mühlstraße')],
+    'Fasanenplatz': [(1840, 'Fasanenstraße')],
+    'Freydorfstraße': [(None, 'Grenadierstraße')],
+    'Gablonzer Straße': [(None, 'Glasweg')],
+    'Henri-Arnaud-Straße': [(None, 'Schulstraße'), (None, 'Zum Vogelsang')],
+    'Im Fischerweg': [(None, 's Schiefe Wegle')],
+    'Karl-Friedrich-Straße': [(1718, 'Carlsgasse'), (1741, 'Bärengasse'), (1787, 'Schlossgasse'), (None, 'Schlossstraße')],
+    'Marstallstraße': [(None, 'Schlossgasse'), (None, 'Schlossplatz'), (None, 'Schlossstraße')],
+    'Moltkestraße': [(None, 'Mühlburger Allee')],
+    'Ochsentorstraße': [(1700, 'Große Rappengasse'), (None, 'Adlerstraße')],
+    'Pfinztalstraße': [(None, 'Hauptstraße'), (1933, 'Adolf-Hitler-Straße')],
+    'Rathausplatz': [(None, 'Niddaplatz')],
+    'Reinhold-Frank-Straße': [(1795, 'Kriegsstraße'), (1878, 'Westendstraße'), (1943, 'Reinhard-Heydrich-Straße'), (1945, 'Westendstraße')],
+    'Rhode-Island-Allee': [(1953, 'Rhode Island Avenue')],
+    'Ritterstraße': [(1718, 'Alt-Dresen-Gasse'), (None, 'Graf Leiningensche Gasse'), (None, 'Rittergasse')],
+    'Rollerstraße': [(None, 'Endtengaß'), (1905, 'Kirchstraße')],
+    'Schlossplatz': [(None, 'Großer/Äußerer Zirkel')],
+    'Zirkel': [(None, 'Kleiner/Innerer Zirkel')],
+    'Zunftstraße': [(None, 'Kronengaß'), (None, 'Kronenstraße')],
+    'Englerstraße': [(1878, 'Schulstraße')],
+    'Im Zeitvogel': [(1567, 'ackher am Zeytvogel')],
+    'Gritznerstraße': [(1758, 'Aan der kleinen salzgaß'), (1906, 'Bahnhofstraße')],
+    'Douglasstraße': [(1837, 'Kasernenstraße')],
+    'Mendelssohnplatz': [(1897, 'Mendelssohnplatz'), (1935, 'Rüppurrer-Tor-Platz')],
+    'Grazer Straße': [(1925, 'Wilhelmstraße'), (1936, 'Saarstraße')],
+    'Gustav-Meerwein-Straße': [(None, 'Walter-Tron-Straße')],
+    'Turnerstraße': [(None, 'Jahnstraße')],
+    'Riedstraße': [(1740, 'in denen Riethwiesen')],
+    'Haid-und-Neu-Straße': [(None, 'Karl-Wilhelm-Straße')],
+    'Ernst-Friedrich-Straße': [(1906, 'Friedrichstraße')],
+    'Huttenstraße': [(None, 'Schillerstraße'), (None, 'Neue Straße')],
+    'Buschweg': [(1740, 'Acker am Busch')],
+    'Gebhardstraße': [(None, 'Friedrichstraße')],
+    'Sankt-Barbara-Weg': [(1936, 'Funkerweg')],
+    'Im Brunnenfeld': [(1963, 'Gartenstraße')],
+    'Weiherfeldstraße': [(None, 'Eisenbahnstraße'), (1907, 'Weiherweg'), (1911, 'Weiherstraße')],
+    'Hotzerweg': [(1532, 'im Hozer'), (1714, 'im Hotzer')],
+    'Reickertstraße': [(1605, 'Reickler')],
+    'Karolinenstraße': [(None, 'Augustastraße')],
+    'Albert-Braun-Straße': [(1933, 'Danziger Straße')],
+    'Moningerstraße': [(1883, 'Grenzestraße')],
+}
+
+
+def copy_props(streets, src, dest, props=None):
+    """
+    Copy properties from one street to another.
+
+    If ``props`` is not given then all properties except the previous
+    names and the year are copied. The destination street is created
+    if necessary.
+    """
+    src_dict = streets[src]
+    dest_dict = streets.setdefault(dest, {'previous': [], 'year': None})
+    if not props:
+        props = [k for k in src_dict if k not in ['previous', 'year']]
+    for k in props:
+        dest_dict[k] = src_dict[k]
+
+
+# Manual renames of streets whose names in the PDF are wrong or outdated,
+# as (old name, new name). They are applied in order.
+MANUAL_RENAMES = [
+    ('Am Schloß Gottesau', 'Am Schloss Gottesaue'),
+    ('Gerda-Krüger-Nieland', 'Gerda-Krüger-Nieland-Straße'),
+    ('Lützowplatz Lützowstraße', 'Lützowstraße'),
+    ('Henriette_Obermüller-Straße', 'Henriette-Obermüller-Straße'),
+    ('Froschhöhl', 'Froschhöhle'),
+    ('Oberrossweide', 'Gewann Oberroßweide'),
+    ('Essostraße', 'ESSO-Straße'),
+    ('Stieglitzstraße', 'Stieglitzweg'),
+    ('Ohio Straße', 'Ohiostraße'),
+    ('Gotthart-Franz-Straße', 'Gotthard-Franz-Straße'),
+    ('Wachhaustraße', 'Wachhausstraße'),
+    ('Ohio Street', 'Ohiostraße'),
+    ('Ringelberghoh', 'Ringelberghohl'),
+    ('Däumlingsweg', 'Däumlingweg'),
+    ('Bruchwaldstaße', 'Bruchwaldstraße'),
+    ('Platz der Gerechtigkeit', 'Platz der Grundrechte'),
+    ('Gebhard-Leibholz-Straße', 'Gerhard-Leibholz-Straße'),
+    ('Gehard-Müller-Straße', 'Gebhard-Müller-Straße'),
+    ('Schmetterlingsweg', 'Schmetterlingweg'),
+    ('Otto-Amman-Platz', 'Otto-Ammann-Platz'),
+]
+
+# Streets which are named after the same thing as another street, as
+# (source, destination). They are applied after the renames.
+MANUAL_COPIES = [
+    ('Gottesauer Straße', 'Am Schloss Gottesaue'),
+    ('Gottesauer Straße', 'Gottesauer Platz'),
+    ('Tullaweg', 'Tullastraße'),
+    ('Tullaweg', 'Tullaplatz'),
+    ('Weinbrennerstraße', 'Weinbrennerplatz'),
+    ('Martin-Luther-Straße', 'Martin-Luther-Platz'),
+    ('Baumeisterstraße', 'Reinhard-Baumeister-Platz'),
+    ('Friedrichsplatz', 'Alte Friedrichstraße'),
+    ('Karl-Wilhelm-Straße', 'Karl-Wilhelm-Platz'),
+    ('Fritz-Haber-Straße', 'Fritz-Haber-Weg'),
+    ('Hildastraße', 'Nördliche Hildapromenade'),
+    ('Hildastraße', 'Südliche Hildapromenade'),
+    ('Werderstraße', 'Werderplatz'),
+    ('Stephanstraße', 'Stephanplatz'),
+    ('Lützowstraße', 'Lützowplatz'),
+    ('Brahmsstraße', 'Brahmsplatz'),
+    ('Hermann-Löns-Weg', 'Lönsstraße'),
+    ('Ebersteinstraße', 'Graf-Eberstein-Straße'),
+    ('Goldgrundstraße', 'Goldwäschergasse'),
+    ('Bismarckstraße', 'Kanzlerstraße'),
+    ('Allmendstraße', 'Zum Allmend'),
+]
+
+
 if __name__ == '__main__':
     HERE = os.path.dirname(os.path.abspath(__file__))
     PDF = os.path.join(HERE, 'strassennamen.pdf')
     JSON = os.path.join(HERE, 'raw_data.json')
-    entries = extract_entries(PDF)
+    CACHE = os.path.join(HERE, '.cache')
+    entries = load_entries(PDF, CACHE)
     streets = parse_entries(entries)
 
-    def copy_props(src, dest, props=None):
-        src_dict = streets[src]
-        dest_dict = streets.setdefault(dest, {'previous':[], 'year':None})
-        if not props:
-            props = [k for k in src_dict if not k in ['previous', 'year']]
-        for k in props:
-            dest_dict[k] = src_dict[k]
-
     # Manual fixes and additions
     #
     # The following changes are manual fixes for errors in the data, fixes
     # for special cases that are too rare to be worth being implemented,
     # and manual additions for missing data.
-    streets['Albring']['previous'] = [(None, 'Albtalstraße'), (1935, 'Kolpingstraße')]
-    streets['Am Alten Bahnhof']['previous'] = [(1920, 'Bahnhofplatz/Eisenbahnstraße')]
-    streets['Am Illwig']['previous'] = [(1957,'Geranienstraße')]
-    streets['Badenwerkstraße']['previous'] = [(None, 'Am Festplatz'), (1964, 'Lammstraße')]
-    streets['Blumentorstraße']['previous'] = [(None, 'Blumenvorstadt'), (1905, 'Blumenstraße')]
-    streets['Eichelgasse']['previous'] = [(1447, 'Müllers-/Eichelgäßle'), (None, 'Mühlgasse'), (1930, 'Mühlstraße')]
-    streets['Fasanenplatz']['previous'] = [(1840, 'Fasanenstraße')]
-    streets['Freydorfstraße']['previous'] = [(None, 'Grenadierstraße')]
-    streets['Gablonzer Straße']['previous'] = [(None, 'Glasweg')]
-    streets['Henri-Arnaud-Straße']['previous'] = [(None, 'Schulstraße'), (None, 'Zum Vogelsang')]
-    streets['Im Fischerweg']['previous'] = [(None, 's Schiefe Wegle')]
-    streets['Karl-Friedrich-Straße']['previous'] = [(1718, 'Carlsgasse'), (1741, 'Bärengasse'), (1787, 'Schlossgasse'), (None, 'Schlossstraße')]
-    streets['Marstallstraße']['previous'] = [(None, 'Schlossgasse'), (None, 'Schlossplatz'), (None, 'Schlossstraße')]
-    streets['Moltkestraße']['previous'] = [(None, 'Mühlburger Allee')]
-    streets['Ochsentorstraße']['previous'] =  [(1700, 'Große Rappengasse'), (None, 'Adlerstraße')]
-    streets['Pfinztalstraße']['previous'] = [(None, 'Hauptstraße'), (1933, 'Adolf-Hitler-Straße')]
-    streets['Rathausplatz']['previous'] = [(None, 'Niddaplatz')]
-    streets['Reinhold-Frank-Straße']['previous'] = [(1795, 'Kriegsstraße'), (1878, 'Westendstraße'), (1943, 'Reinhard-Heydrich-Straße'), (1945, 'Westendstraße')]
-    streets['Rhode-Island-Allee']['previous'] = [(1953, 'Rhode Island Avenue')]
-    streets['Ritterstraße']['previous'] = [(1718, 'Alt-Dresen-Gasse'), (None, 'Graf Leiningensche Gasse'), (None, 'Rittergasse')]
-    streets['Rollerstraße']['previous'] = [(None, 'Endtengaß'), (1905, 'Kirchstraße')]
-    streets['Schlossplatz']['previous'] = [(None, 'Großer/Äußerer Zirkel')]
-    streets['Zirkel']['previous'] = [(None, 'Kleiner/Innerer Zirkel')]
-    streets['Zunftstraße']['previous'] = [(None, 'Kronengaß'), (None, 'Kronenstraße')]
-    streets['Am Schloss Gottesaue'] = streets.pop('Am Schloß Gottesau')
-    copy_props('Gottesauer Straße', 'Am Schloss Gottesaue')
-    copy_props('Gottesauer Straße', 'Gottesauer Platz')
-    streets['Englerstraße']['previous'] = [(1878, 'Schulstraße')]
-    streets['Im Zeitvogel']['previous'] = [(1567, 'ackher am Zeytvogel')]
-    streets['Gerda-Krüger-Nieland-Straße'] = streets.pop('Gerda-Krüger-Nieland')
-    copy_props('Tullaweg', 'Tullastraße')
-    copy_props('Tullaweg', 'Tullaplatz')
-    streets['Gritznerstraße']['previous'] = [(1758, 'Aan der kleinen salzgaß'), (1906, 'Bahnhofstraße')]
-    copy_props('Weinbrennerstraße', 'Weinbrennerplatz')
-    streets['Douglasstraße']['previous'] = [(1837, 'Kasernenstraße')]
-    streets['Mendelssohnplatz']['previous'] = [(1897, 'Mendelssohnplatz'), (1935, 'Rüppurrer-Tor-Platz')]
-    copy_props('Martin-Luther-Straße', 'Martin-Luther-Platz')
-    streets['Grazer Straße']['previous'] = [(1925, 'Wilhelmstraße'), (1936, 'Saarstraße')]
-    copy_props('Baumeisterstraße', 'Reinhard-Baumeister-Platz')
-    streets['Gustav-Meerwein-Straße']['previous'] = [(None, 'Walter-Tron-Straße')]
-    streets['Turnerstraße']['previous'] = [(None, 'Jahnstraße')]
-    streets['Riedstraße']['previous'] = [(1740, 'in denen Riethwiesen')]
-    copy_props('Friedrichsplatz', 'Alte Friedrichstraße')
-    streets['Haid-und-Neu-Straße']['previous'] = [(None, 'Karl-Wilhelm-Straße')]
-    copy_props('Karl-Wilhelm-Straße', 'Karl-Wilhelm-Platz')
-    copy_props('Fritz-Haber-Straße', 'Fritz-Haber-Weg')
-    copy_props('Hildastraße', 'Nördliche Hildapromenade')
-    copy_props('Hildastraße', 'Südliche Hildapromenade')
-    streets['Ernst-Friedrich-Straße']['previous'] = [(1906, 'Friedrichstraße')]
-    copy_props('Werderstraße', 'Werderplatz')
-    copy_props('Stephanstraße', 'Stephanplatz')
-    streets['Huttenstraße']['previous'] = [(None,'Schillerstraße'), (None, 'Neue Straße')]
-    streets['Lützowstraße'] = streets.pop('Lützowplatz Lützowstraße')
-    copy_props('Lützowstraße', 'Lützowplatz')
-    copy_props('Brahmsstraße', 'Brahmsplatz')
-    copy_props('Hermann-Löns-Weg', 'Lönsstraße')
-    streets['Buschweg']['previous'] = [(1740, 'Acker am Busch')]
-    streets['Gebhardstraße']['previous'] = [(None, 'Friedrichstraße')]
-    streets['Sankt-Barbara-Weg']['previous'] = [(1936, 'Funkerweg')]
-    copy_props('Ebersteinstraße', 'Graf-Eberstein-Straße')
-    streets['Im Brunnenfeld']['previous'] = [(1963, 'Gartenstraße')]
-    streets['Weiherfeldstraße']['previous'] = [(None, 'Eisenbahnstraße'), (1907, 'Weiherweg'), (1911, 'Weiherstraße')]
-    streets['Henriette-Obermüller-Straße'] = streets.pop('Henriette_Obermüller-Straße')
-    streets['Hotzerweg']['previous'] = [(1532, 'im Hozer'), (1714, 'im Hotzer')]
-    copy_props('Goldgrundstraße', 'Goldwäschergasse')
-    streets['Reickertstraße']['previous'] = [(1605, 'Reickler')]
-    streets['Karolinenstraße']['previous'] = [(None, 'Augustastraße')]
-    copy_props('Bismarckstraße', 'Kanzlerstraße')
-    streets['Albert-Braun-Straße']['previous'] = [(1933, 'Danziger Straße')]
-    copy_props('Allmendstraße', 'Zum Allmend')
+    for name, previous in MANUAL_PREVIOUS.items():
+        streets[name]['previous'] = previous
+    for old, new in MANUAL_RENAMES:
+        streets[new] = streets.pop(old)
+    for src, dest in MANUAL_COPIES:
+        copy_props(streets, src, dest)
     streets['Hauckstraße'] = streets.pop('Goethestraße')
     streets['Hauckstraße']['year'] = 1950
     streets['Goethestraße'] = {
@@ -276,23 +416,6 @@ if __name__ == '__main__':
         'info': 'Johann Wolfgang von Goethe, + 28.8.1749 Frankfurt, + 22.3.1832 Weimar. Der Dichter hielt sich 1775, 1779 und 1815 in Karlsruhe auf. Während seines letzten Aufenthalts in Karlsruhe, als er im König von England, Ecke Kaiserstraße/Ritterstraße wohnte, traf er Johann Peter Hebel, Heinrich Jung-Stilling und Friedrich Weinbrenner. Faust.',
         'previous': [],
     }
-    streets['Moningerstraße']['previous'] = [(1883, 'Grenzestraße')]
-    streets['Froschhöhle'] = streets.pop('Froschhöhl')
-    streets['Gewann Oberroßweide'] = streets.pop('Oberrossweide')
-    streets['ESSO-Straße'] = streets.pop('Essostraße')
-    streets['Stieglitzweg'] = streets.pop('Stieglitzstraße')
-    streets['Ohiostraße'] = streets.pop('Ohio Straße')
-    streets['Gotthard-Franz-Straße'] = streets.pop('Gotthart-Franz-Straße')
-    streets['Wachhausstraße'] = streets.pop('Wachhaustraße')
-    streets['Ohiostraße'] = streets.pop('Ohio Street')
-    streets['Ringelberghohl'] = streets.pop('Ringelberghoh')
-    streets['Däumlingweg'] = streets.pop('Däumlingsweg')
-    streets['Bruchwaldstraße'] = streets.pop('Bruchwaldstaße')
-    streets['Platz der Grundrechte'] = streets.pop('Platz der Gerechtigkeit')
-    streets['Gerhard-Leibholz-Straße'] = streets.pop('Gebhard-Leibholz-Straße')
-    streets['Gebhard-Müller-Straße'] = streets.pop('Gehard-Müller-Straße')
-    streets['Schmetterlingweg'] = streets.pop('Schmetterlingsweg')
-    streets['Otto-Ammann-Platz'] = streets.pop('Otto-Amman-Platz')
 
     # TODO: Information that's currently missing (does not include
     # most stuff that's already set to ``None``):
@@ -317,5 +440,5 @@ if __name__ == '__main__':
     # - "Platz am Wasserturm" is called Hanne-Landgraf-Platz since 2014 (named
     #   after Hanne Landgraf, https://de.wikipedia.org/wiki/Hanne_Landgraf)
 
-    with codecs.open(JSON, 'w', encoding='utf8') as f:
-        json.dump(streets, f, sort_keys=True, indent=4, separators=(',', ': '))
+    with open(JSON, 'wb') as f:
+        f.write(to_json(streets))
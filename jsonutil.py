@@ -0,0 +1,58 @@
+# vim: set fileencoding=utf-8 :
+
+# Copyright (c) 2015 Code for Karlsruhe (http://codefor.de/karlsruhe)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Helpers for writing the JSON outputs of the scripts.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_json(data, compact=False):
+    """
+    Serialize data into UTF-8 encoded JSON.
+
+    By default the output is pretty-printed with sorted keys. If
+    ``compact`` is true then no whitespace is added and the key order
+    is kept.
+
+    Uses ``orjson`` if it is available, since it is much faster than
+    the ``json`` module from the standard library. Both produce the
+    same bytes.
+    """
+    if compact:
+        if orjson:
+            return orjson.dumps(data)
+        s = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    else:
+        if orjson:
+            return orjson.dumps(data, option=orjson.OPT_SORT_KEYS |
+                                orjson.OPT_INDENT_2)
+        s = json.dumps(data, sort_keys=True, indent=2,
+                       separators=(',', ': '), ensure_ascii=False)
+    return s.encode('utf8')
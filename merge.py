@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # vim: set fileencoding=utf-8 :
 
 # Copyright (c) 2015 Code for Karlsruhe (http://codefor.de/karlsruhe)
@@ -28,16 +28,19 @@ Takes ``streets.geojson`` and ``streetnames.json`` and outputs
 ``streetnames.geojson``.
 """
 
-from __future__ import unicode_literals
-
-import codecs
+import functools
 import json
 import os.path
-import re
 
-import geojson
+from jsonutil import to_json
+
+
+# Removes dashes and replaces "ß" by "ss" in a single pass
+NAME_TRANSLATION = str.maketrans({'-': None, 'ß': 'ss'})
 
 
+# Most names occur in both data sources, so the results are cached
+@functools.lru_cache(maxsize=None)
 def normalize_name(n):
     """
     Normalize street name.
@@ -46,12 +49,8 @@ def normalize_name(n):
     different data sources. This function tries to reduce these
     differences.
     """
-    n = (n.replace('St.', 'sankt')
-          .lower()
-          .replace('-', '')
-          .replace('ß', 'ss')
-          .strip())
-    return re.sub(r'\s+', ' ', n)
+    n = n.replace('St.', 'sankt').lower().translate(NAME_TRANSLATION)
+    return ' '.join(n.split())
 
 
 if __name__ == '__main__':
@@ -60,27 +59,27 @@ if __name__ == '__main__':
     COORDINATES = os.path.join(HERE, 'coordinates.geojson')
     MERGED = os.path.join(HERE, 'streetnames.geojson')
 
-    with codecs.open(COORDINATES, 'r', encoding='utf8') as f:
-        coordinates = geojson.load(f)
+    with open(COORDINATES, encoding='utf8') as f:
+        coordinates = json.load(f)
     features = {}
     for feature in coordinates['features']:
-        features[normalize_name(feature.id)] = feature
+        features[normalize_name(feature['id'])] = feature
 
-    with codecs.open(NAMES, 'r', encoding='utf8') as f:
+    with open(NAMES, encoding='utf8') as f:
         names = json.load(f)
     complete_features = []
-    for name, props in names.iteritems():
+    for name, props in names.items():
         if not (props['year'] or props['previous'] or props['info']):
-            print 'No information about "%s"' % name
+            print('No information about "%s"' % name)
             continue
         try:
             feature = features[normalize_name(name)]
-            feature.properties = props
+            feature['properties'] = props
         except KeyError:
-            print 'Could not find coordinates for "%s"' % name
+            print('Could not find coordinates for "%s"' % name)
             continue
         complete_features.append(feature)
 
-    collection = geojson.FeatureCollection(complete_features)
-    with codecs.open(MERGED, 'w', encoding='utf8') as f:
-        geojson.dump(collection, f)
+    collection = {'type': 'FeatureCollection', 'features': complete_features}
+    with open(MERGED, 'wb') as f:
+        f.write(to_json(collection, compact=True))
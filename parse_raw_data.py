@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # vim: set fileencoding=utf-8 :
 
 # Copyright (c) 2015 Code for Karlsruhe (http://codefor.de/karlsruhe)
@@ -27,13 +27,12 @@ Script to parse raw street name data and extract secondary information.
 Takes ``raw_data.json`` and outputs data into ``names.json``.
 """
 
-from __future__ import unicode_literals
-
-import codecs
 import json
 import os.path
 import re
 
+from jsonutil import to_json
+
 
 FLAGS = re.UNICODE | re.IGNORECASE
 
@@ -82,30 +81,49 @@ DATE_REGEXES = [
 ]
 
 # Allow 'o' as a digit
-DATE_REGEXES = [r.replace(r'\d', r'(?:\d|o)') for r in DATE_REGEXES]
+DATE_REGEXES = [r.replace(r'\d', r'[\do]') for r in DATE_REGEXES]
 
 
-def extract_year(s, prefixes=None):
+def compile_date_regex(prefixes=None):
     """
-    Try to extract a year from a string.
+    Compile a regex that matches a date preceded by a prefix.
+
+    ``prefixes`` is an optional list of patterns that may occur before
+    the actual date. All prefixes and all ``DATE_REGEXES`` are combined
+    into a single pattern so that a string can be searched in one pass.
+    Each date regex contributes one group which captures the year.
+    """
+    prefix = '|'.join('(?:%s)' % p for p in (prefixes or ['']))
+    date = '|'.join('(?:%s)' % p for p in DATE_REGEXES)
+    return re.compile(r'(?:%s)\s*(?:%s)' % (prefix, date), FLAGS)
+
 
-    ``s`` is the string to search in. ``prefixes`` is an optional list
-    of patterns that may occur before the actual date.
+BIRTH_REGEX = compile_date_regex([r'\*', r'geb\.'])
+DEATH_REGEX = compile_date_regex([r'†', r'\+', r'gest\.', r'hingerichtet:',
+                                  r'gestorben'])
+
+DIGIT_REGEX = re.compile(r'\d', FLAGS)
+
+# Plain substrings of the prefixes of BIRTH_REGEX and DEATH_REGEX in lower
+# case. A date regex can only match if one of them occurs in the text.
+BIRTH_MARKERS = ('*', 'geb.')
+DEATH_MARKERS = ('†', '+', 'gest', 'hingerichtet:')
+
+
+def extract_year(s, regex):
+    """
+    Try to extract a year from a string.
 
-    Dates must match one of the regexes in ``DATE_REGEXES`` (in
-    combination with one of the prefixes if any are given).
+    ``s`` is the string to search in. ``regex`` is a compiled date
+    regex as returned by ``compile_date_regex``.
 
     The year of the first date found is returned. If no matching date
     is found then ``None`` is returned.
     """
-    prefixes = [unicode(p) for p in (prefixes or [''])]
-    for pattern in DATE_REGEXES:
-        for prefix in prefixes:
-            p = prefix + r'\s*' + pattern
-            m = re.search(p, s, FLAGS)
-            if not m:
-                continue
-            return int(m.groups()[0].replace('o', '0'))
+    m = regex.search(s)
+    if m:
+        year = next(g for g in m.groups() if g)
+        return int(year.replace('o', '0'))
 
 
 def extract_person_data(info):
@@ -115,14 +133,27 @@ def extract_person_data(info):
     Returns a tuple containing the person's name and the years of birth
     and death. Each of these may be ``None`` if the extraction failed.
     """
-    birth = extract_year(info, prefixes=[r'\*', r'geb\.'])
-    death = extract_year(info, prefixes=[r'†', r'\+', r'gest\.', r'hingerichtet:',
-                         r'gestorben'])
-    name = None
+    if not DIGIT_REGEX.search(info):
+        # Many entries contain no dates at all. Even though 'o' is
+        # allowed as a digit a year in practice contains at least one real
+        # digit, so we can skip the date regexes in that case.
+        return None, None, None
+    lower = info.lower()
+    birth = death = name = None
+    if any(marker in lower for marker in BIRTH_MARKERS):
+        birth = extract_year(info, BIRTH_REGEX)
+    if any(marker in lower for marker in DEATH_MARKERS):
+        death = extract_year(info, DEATH_REGEX)
     if birth or death:
-        m = re.match(r'^([\w\s\-.]+)', info, FLAGS)
-        if m:
-            name = m.groups()[0].strip()
+        # The name is the leading run of word characters, whitespace,
+        # dashes and dots.
+        i = 0
+        n = len(info)
+        while i < n and (info[i].isalnum() or info[i].isspace() or
+                         info[i] in '_-.'):
+            i += 1
+        if i:
+            name = info[:i].strip()
             if name.endswith(' geb'):
                 # Birth name ("geboren")
                 name = name[:-4]
@@ -140,7 +171,7 @@ def parse_entries(streets):
     """
     Parse street name data to extract additional information.
     """
-    for street in streets.itervalues():
+    for street in streets.values():
         person, birth, death = extract_person_data(street['info'])
         if person or birth or death:
             street['person'] = person
@@ -185,7 +216,7 @@ def guess_genders(streets):
     """
     Guess genders of persons.
     """
-    for street in streets.itervalues():
+    for street in streets.values():
         try:
             street['gender'] = guess_gender(street['person'])
         except KeyError:
@@ -193,126 +224,164 @@ def guess_genders(streets):
             pass
 
 
+def set_props(streets, name, props):
+    """
+    Set properties of a street.
+    """
+    streets[name].update(props)
+
+
+def a_person(streets, name, person, birth, death):
+    """
+    Mark a street as being named after a person.
+    """
+    set_props(streets, name, {'person': person, 'birth': birth,
+                              'death': death})
+
+
+def not_a_person(streets, name):
+    """
+    Mark a street as not being named after a (single) person.
+    """
+    for k in ['person', 'birth', 'death']:
+        del streets[name][k]
+
+
+def copy_person(streets, src, dest):
+    """
+    Copy person data from one street to another.
+    """
+    src_dict = streets[src]
+    dest_dict = streets[dest]
+    for k in ['birth', 'death', 'person']:
+        dest_dict[k] = src_dict[k]
+
+
+_FIX_HANDLERS = {
+    'set': set_props,
+    'person': a_person,
+    'no person': not_a_person,
+    'copy': copy_person,
+}
+
+
+def apply_fixes(streets, fixes):
+    """
+    Apply a list of manual fixes.
+
+    Each fix is a tuple whose first item is the name of the fix type
+    (see ``_FIX_HANDLERS``) and whose remaining items are the arguments
+    for the corresponding handler.
+    """
+    for fix in fixes:
+        _FIX_HANDLERS[fix[0]](streets, *fix[1:])
+
+
+# Manual fixes and additions
+#
+# The following changes are manual fixes for errors in the data, fixes
+# for special cases that are too rare to be worth being implemented,
+# and manual additions for missing data. They are applied in order.
+MANUAL_FIXES = [
+    ('set', 'Englerstraße', {'person': 'Karl Engler'}),
+    ('person', 'Guntherstraße', 'Gundahar', None, 436),
+    ('set', 'Agathenstraße', {'person': 'Agathe von Baden-Durlach'}),
+    ('set', 'Gerda-Krüger-Nieland-Straße', {'person': 'Gerda Krüger-Nieland'}),
+    ('copy', 'Tullaweg', 'Tullastraße'),
+    ('copy', 'Tullaweg', 'Tullaplatz'),
+    ('person', 'Petrus-Waldus-Straße', 'Petrus Waldus', None, None),
+    ('person', 'Am Thomashäusle', 'Thomas Dorner', None, None),
+    ('set', 'Gritznerstraße', {'person': 'Max Karl Gritzner'}),
+    ('copy', 'Weinbrennerstraße', 'Weinbrennerplatz'),
+    ('set', 'Martinstraße', {'person': 'Sankt Martin'}),
+    ('set', 'Nikolausstraße', {'person': 'Sankt Nikolaus'}),
+    ('set', 'Kaiserstraße', {'person': 'Wilhelm I.'}),
+    ('copy', 'Kaiserstraße', 'Kaiserpassage'),
+    ('copy', 'Kaiserstraße', 'Kaiserplatz'),
+    ('copy', 'Kaiserstraße', 'Kaiserallee'),
+    ('set', 'Sepp-Herberger-Weg', {'person': 'Joseph Herberger'}),
+    ('set', 'Mendelssohnplatz', {'person': 'Moses Mendelssohn'}),
+    ('copy', 'Martin-Luther-Straße', 'Martin-Luther-Platz'),
+    ('set', 'Rolandplatz', {'person': 'Roland'}),
+    ('set', 'Karlstraße', {'person': 'Karl Ludwig Friedrich von Baden'}),
+    ('no person', 'Curjel-und-Moser-Straße'),
+    ('copy', 'Baumeisterstraße', 'Reinhard-Baumeister-Platz'),
+    ('set', 'Laurentiusstraße', {'person': 'Sankt Laurentius'}),
+    ('no person', 'Winkler-Dentz-Straße'),
+    ('no person', 'Eichrodtweg'),
+    ('no person', 'Bernhardstraße'),
+    ('person', 'Bernhardusplatz', 'Bernhard II. von Baden', 1428, 1458),
+    ('no person', 'Geschwister-Scholl-Straße'),
+    ('set', 'Jakob-Dörr-Straße', {'birth': 1884, 'death': 1971}),
+    ('person', 'Besoldgasse', 'Christoph Besold', None, None),
+    ('set', 'Ostendorfstraße', {'death': 1915}),
+    ('set', 'Rudolfstraße', {'person': 'Rudolf I. von Baden'}),
+    ('no person', 'Gebrüder-Bachert-Straße'),
+    ('copy', 'Friedrichsplatz', 'Alte Friedrichstraße'),
+    ('no person', 'Haid-und-Neu-Straße'),
+    ('copy', 'Karl-Wilhelm-Straße', 'Karl-Wilhelm-Platz'),
+    ('copy', 'Fritz-Haber-Straße', 'Fritz-Haber-Weg'),
+    ('set', 'Markusstraße', {'person': 'Sankt Markus'}),
+    ('set', 'Luisenstraße', {'person': 'Luise Marie Elisabeth von Preußen'}),
+    ('copy', 'Hildastraße', 'Nördliche Hildapromenade'),
+    ('copy', 'Hildastraße', 'Südliche Hildapromenade'),
+    ('set', 'Ernst-Friedrich-Straße', {'person': 'Ernst Friedrich'}),
+    ('set', 'Margarethenstraße', {'person': 'Margarethe Margräfin von Baden'}),
+    ('set', 'Ludwig-Wilhelm-Straße', {'person': 'Ludwig Wilhelm Prinz von Baden'}),
+    ('copy', 'Werderstraße', 'Werderplatz'),
+    ('set', 'Ada-Lovelace-Straße', {'person': 'Ada Lovelace'}),
+    ('no person', 'Bertholdstraße'),
+    ('set', 'Karl-Friedrich-Straße', {'person': 'Karl Friedrich von Baden'}),
+    ('set', 'Stephanstraße', {'person': 'Heinrich von Stephan'}),
+    ('copy', 'Stephanstraße', 'Stephanplatz'),
+    ('set', 'Huttenstraße', {'person': 'Ulrich Reichsritter von Hutten'}),
+    ('person', 'Schultheiß-Kiefer-Straße', 'Erhard Kiefer', None, None),
+    ('copy', 'Lützowstraße', 'Lützowplatz'),
+    ('set', 'Sankt-Florian-Straße', {'person': 'Sankt Florian'}),
+    ('person', 'Blankenhornweg', 'Adolph Blankenhorn', 1843, 1906),
+    ('copy', 'Karlstraße', 'Karlstor'),
+    ('copy', 'Brahmsstraße', 'Brahmsplatz'),
+    ('copy', 'Hermann-Löns-Weg', 'Lönsstraße'),
+    ('no person', 'Gebrüder-Grimm-Straße'),
+    ('set', 'Hubertusallee', {'person': 'Hubrtus von Lüttich'}),
+    ('set', 'Philippstraße', {'person': 'Philipp I. von Baden'}),
+    ('set', 'Sankt-Valentin-Platz', {'person': 'Sankt Valentin von Terni'}),
+    ('set', 'Gebhardstraße', {'person': 'Gebhard III. von Zähringen'}),
+    ('person', 'Rosalienberg', 'Rosalie Lichtenauer', None, None),
+    ('set', 'Charlottenstraße', {'person': 'Anna Charlotte Amalie von Nassau-Dietz-Oranien'}),
+    ('set', 'Sankt-Barbara-Weg', {'person': 'Sankt Barbara'}),
+    ('person', 'Graf-Konrad-Straße', 'Konrad I. von Kärnten', 975, 1011),
+    ('no person', 'Christofstraße'),
+    ('set', 'Hennebergstraße', {'person': 'Berthold von Hohenberg'}),
+    ('person', 'Winkelriedstraße', 'Arnold von Winkelried', None, 1386),
+    ('set', 'Viktoriastraße', {'person': 'Viktoria von Baden'}),
+    ('person', 'Schultheißenstraße', 'Bernhard Metz', None, None),
+    ('set', 'Sophienstraße', {'person': 'Sophie Wilhelmine von Schleswig-Holstein-Gottorf'}),
+    ('set', 'Augustastraße', {'person': 'Augusta von Sachsen-Weimar-Eisenach'}),
+    ('set', 'Karolinenstraße', {'person': 'Karoline von Baden'}),
+    ('copy', 'Bismarckstraße', 'Kanzlerstraße'),
+    ('no person', 'Friedenstraße'),
+    ('set', 'Marie-Alexandra-Straße', {'person': 'Marie Alexandra von Baden'}),
+    ('set', 'Erbprinzenstraße', {'person': 'Karl Ludwig von Baden'}),
+    ('set', 'Hauckstraße', {'year': 1950}),
+    ('set', 'Goethestraße', {'person': 'Johann Wolfgang von Goethe',
+                             'birth': 1749, 'death': 1832}),
+    ('set', 'Ernststraße', {'person': 'Ernst I. von Baden-Durlach'}),
+    ('set', 'Kronprinzenstraße', {'person': 'Friedrich Wilhelm Victor August Ernst von Preußen'}),
+]
+
+
 if __name__ == '__main__':
     HERE = os.path.dirname(os.path.abspath(__file__))
     SOURCE = os.path.join(HERE, 'raw_data.json')
     TARGET = os.path.join(HERE, 'names.json')
 
-    with codecs.open(SOURCE, 'r', encoding='utf8') as f:
+    with open(SOURCE, encoding='utf8') as f:
         streets = json.load(f)
 
     parse_entries(streets)
 
-    def copy_person(src, dest):
-        src_dict = streets[src]
-        dest_dict = streets[dest]
-        for k in ['birth', 'death', 'person']:
-            dest_dict[k] = src_dict[k]
-
-    def a_person(name, person, birth, death):
-        streets[name]['person'] = person
-        streets[name]['birth'] = birth
-        streets[name]['death'] = death
-
-    def not_a_person(name):
-        del streets[name]['person']
-        del streets[name]['birth']
-        del streets[name]['death']
-
-    # Manual fixes and additions
-    #
-    # The following changes are manual fixes for errors in the data, fixes
-    # for special cases that are too rare to be worth being implemented,
-    # and manual additions for missing data.
-    streets['Englerstraße']['person'] = 'Karl Engler'
-    a_person('Guntherstraße', 'Gundahar', None, 436)
-    streets['Agathenstraße']['person'] = 'Agathe von Baden-Durlach'
-    streets['Gerda-Krüger-Nieland-Straße']['person'] = 'Gerda Krüger-Nieland'
-    copy_person('Tullaweg', 'Tullastraße')
-    copy_person('Tullaweg', 'Tullaplatz')
-    a_person('Petrus-Waldus-Straße', 'Petrus Waldus', None, None)
-    a_person('Am Thomashäusle', 'Thomas Dorner', None, None)
-    streets['Gritznerstraße']['person'] = 'Max Karl Gritzner'
-    copy_person('Weinbrennerstraße', 'Weinbrennerplatz')
-    streets['Martinstraße']['person'] = 'Sankt Martin'
-    streets['Nikolausstraße']['person'] = 'Sankt Nikolaus'
-    streets['Kaiserstraße']['person'] = 'Wilhelm I.'
-    copy_person('Kaiserstraße', 'Kaiserpassage')
-    copy_person('Kaiserstraße', 'Kaiserplatz')
-    copy_person('Kaiserstraße', 'Kaiserallee')
-    streets['Sepp-Herberger-Weg']['person'] = 'Joseph Herberger'
-    streets['Mendelssohnplatz']['person'] = 'Moses Mendelssohn'
-    copy_person('Martin-Luther-Straße', 'Martin-Luther-Platz')
-    streets['Rolandplatz']['person'] = 'Roland'
-    streets['Karlstraße']['person'] = 'Karl Ludwig Friedrich von Baden'
-    not_a_person('Curjel-und-Moser-Straße')
-    copy_person('Baumeisterstraße', 'Reinhard-Baumeister-Platz')
-    streets['Laurentiusstraße']['person'] = 'Sankt Laurentius'
-    not_a_person('Winkler-Dentz-Straße')
-    not_a_person('Eichrodtweg')
-    not_a_person('Bernhardstraße')
-    a_person('Bernhardusplatz', 'Bernhard II. von Baden', 1428, 1458)
-    not_a_person('Geschwister-Scholl-Straße')
-    streets['Jakob-Dörr-Straße']['birth'] = 1884
-    streets['Jakob-Dörr-Straße']['death'] = 1971
-    a_person('Besoldgasse', 'Christoph Besold', None, None)
-    streets['Ostendorfstraße']['death'] = 1915
-    streets['Rudolfstraße']['person'] = 'Rudolf I. von Baden'
-    not_a_person('Gebrüder-Bachert-Straße')
-    copy_person('Friedrichsplatz', 'Alte Friedrichstraße')
-    not_a_person('Haid-und-Neu-Straße')
-    copy_person('Karl-Wilhelm-Straße', 'Karl-Wilhelm-Platz')
-    copy_person('Fritz-Haber-Straße', 'Fritz-Haber-Weg')
-    streets['Markusstraße']['person'] = 'Sankt Markus'
-    streets['Luisenstraße']['person'] = 'Luise Marie Elisabeth von Preußen'
-    copy_person('Hildastraße', 'Nördliche Hildapromenade')
-    copy_person('Hildastraße', 'Südliche Hildapromenade')
-    streets['Ernst-Friedrich-Straße']['person'] = 'Ernst Friedrich'
-    streets['Margarethenstraße']['person'] = 'Margarethe Margräfin von Baden'
-    streets['Ludwig-Wilhelm-Straße']['person'] = 'Ludwig Wilhelm Prinz von Baden'
-    copy_person('Werderstraße', 'Werderplatz')
-    streets['Ada-Lovelace-Straße']['person'] = 'Ada Lovelace'
-    not_a_person('Bertholdstraße')
-    streets['Karl-Friedrich-Straße']['person'] = 'Karl Friedrich von Baden'
-    streets['Stephanstraße']['person'] = 'Heinrich von Stephan'
-    copy_person('Stephanstraße', 'Stephanplatz')
-    streets['Huttenstraße']['person'] = 'Ulrich Reichsritter von Hutten'
-    a_person('Schultheiß-Kiefer-Straße','Erhard Kiefer', None, None)
-    copy_person('Lützowstraße', 'Lützowplatz')
-    streets['Sankt-Florian-Straße']['person'] = 'Sankt Florian'
-    a_person('Blankenhornweg', 'Adolph Blankenhorn', 1843, 1906)
-    copy_person('Karlstraße', 'Karlstor')
-    copy_person('Brahmsstraße', 'Brahmsplatz')
-    copy_person('Hermann-Löns-Weg', 'Lönsstraße')
-    not_a_person('Gebrüder-Grimm-Straße')
-    streets['Hubertusallee']['person'] = 'Hubrtus von Lüttich'
-    streets['Philippstraße']['person'] = 'Philipp I. von Baden'
-    streets['Sankt-Valentin-Platz']['person'] = 'Sankt Valentin von Terni'
-    streets['Gebhardstraße']['person'] = 'Gebhard III. von Zähringen'
-    a_person('Rosalienberg', 'Rosalie Lichtenauer', None, None)
-    streets['Charlottenstraße']['person'] = 'Anna Charlotte Amalie von Nassau-Dietz-Oranien'
-    streets['Sankt-Barbara-Weg']['person'] = 'Sankt Barbara'
-    a_person('Graf-Konrad-Straße', 'Konrad I. von Kärnten', 975, 1011)
-    not_a_person('Christofstraße')
-    streets['Hennebergstraße']['person'] = 'Berthold von Hohenberg'
-    a_person('Winkelriedstraße', 'Arnold von Winkelried', None, 1386)
-    streets['Viktoriastraße']['person'] = 'Viktoria von Baden'
-    a_person('Schultheißenstraße', 'Bernhard Metz', None, None)
-    streets['Sophienstraße']['person'] = 'Sophie Wilhelmine von Schleswig-Holstein-Gottorf'
-    streets['Augustastraße']['person'] = 'Augusta von Sachsen-Weimar-Eisenach'
-    streets['Karolinenstraße']['person'] = 'Karoline von Baden'
-    copy_person('Bismarckstraße', 'Kanzlerstraße')
-    not_a_person('Friedenstraße')
-    streets['Marie-Alexandra-Straße']['person'] = 'Marie Alexandra von Baden'
-    streets['Erbprinzenstraße']['person'] = 'Karl Ludwig von Baden'
-    streets['Hauckstraße']['year'] = 1950
-    streets['Goethestraße'].update({
-        'person': 'Johann Wolfgang von Goethe',
-        'birth': 1749,
-        'death': 1832,
-    })
-    streets['Ernststraße']['person'] = 'Ernst I. von Baden-Durlach'
-    streets['Kronprinzenstraße']['person'] = 'Friedrich Wilhelm Victor August Ernst von Preußen'
+    apply_fixes(streets, MANUAL_FIXES)
 
     guess_genders(streets)
 
@@ -331,5 +400,5 @@ if __name__ == '__main__':
     #    Gebrüder-Grimm-Straße
     #    Christofstraße
 
-    with codecs.open(TARGET, 'w', encoding='utf8') as f:
-        json.dump(streets, f, sort_keys=True, indent=4, separators=(',', ': '))
+    with open(TARGET, 'wb') as f:
+        f.write(to_json(streets))
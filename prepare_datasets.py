@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # vim: set fileencoding=utf-8 :
 
 # Copyright (c) 2015 Code for Karlsruhe (http://codefor.de/karlsruhe)
@@ -27,45 +27,46 @@ Script to prepare individual datasets from complete data.
 Takes ``streetnames.geojson`` and outputs various JSON files.
 """
 
-from __future__ import unicode_literals
-
-import codecs
+import collections
 import json
 import os.path
-import re
 
-import geojson
+from jsonutil import to_json
 
 
 if __name__ == '__main__':
     HERE = os.path.dirname(os.path.abspath(__file__))
     SOURCE = os.path.join(HERE, 'streetnames.geojson')
 
-    with codecs.open(SOURCE, 'r', encoding='utf8') as f:
-        data = geojson.load(f)
+    with open(SOURCE, encoding='utf8') as f:
+        data = json.load(f)
     features = {}
     for feature in data['features']:
-        features[feature.id] = feature
+        features[feature['id']] = feature
 
     def save(data, basename):
         filename = os.path.join(HERE, basename)
-        with codecs.open(filename, 'w', encoding='utf8') as f:
-            geojson.dump(data, f)
+        with open(filename, 'wb') as f:
+            f.write(to_json(data, compact=True))
 
-    def select(fun):
-        return [f for f in features.itervalues() if fun(f['properties'])]
+    def group(prop):
+        groups = collections.defaultdict(lambda: [])
+        for f in features.values():
+            groups[f['properties'].get(prop)].append(f)
+        return groups
 
     #
     # Gender
     #
+    by_gender = group('gender')
     dataset = [
         {
-            'features': select(lambda p: p.get('gender') == 'm'),
+            'features': by_gender['m'],
             'label': 'männlich',
             'color': '#ff7f00',
         },
         {
-            'features': select(lambda p: p.get('gender') == 'f'),
+            'features': by_gender['f'],
             'label': 'weiblich',
             'color': '#007fff',
         },